@@ -0,0 +1,158 @@
+import os
+from functools import lru_cache
+
+import numpy as np
+
+BASELINE_DIR = "baselines"
+BASELINE_SIGNALS = ["cpu_temp_c", "fan_rpm", "psu_voltage_v", "psu_power_w"]
+
+# Absolute tolerance floors; the band is max(floor, rel_tol * |golden|)
+ABS_TOLERANCE = {"cpu_temp_c": 2.0, "fan_rpm": 100.0, "psu_voltage_v": 0.1, "psu_power_w": 5.0}
+UNITS = {"cpu_temp_c": "C", "fan_rpm": "RPM", "psu_voltage_v": "V", "psu_power_w": "W"}
+
+# Direction in which leaving the band is a regression: hotter, a fan working
+# harder, a lower rail, more power. Leaving it the other way is only reported
+REGRESSION_DIRECTION = {"cpu_temp_c": 1, "fan_rpm": 1, "psu_voltage_v": -1, "psu_power_w": 1}
+
+def baseline_path(plan_path, baseline_dir=BASELINE_DIR):
+    stem = os.path.splitext(os.path.basename(plan_path))[0]
+    return os.path.join(baseline_dir, f"{stem}.npz")
+
+def split_steps(telemetry, signals=BASELINE_SIGNALS):
+    """
+    Groups telemetry by step index into {step: {signal: array}}.
+    """
+    rows = {}
+    for sample in telemetry:
+        rows.setdefault(sample['step'], []).append(sample)
+    return {
+        step: {signal: np.array([d[signal] for d in samples], dtype=np.float64) for signal in signals}
+        for step, samples in rows.items()
+    }
+
+def settle_ticks(series, floor, rel_tol):
+    """
+    Ticks until the series stays within tolerance of its end-of-step value.
+    """
+    if len(series) == 0:
+        return 0
+    band = np.maximum(floor, rel_tol * np.abs(series[-1]))
+    outside = np.nonzero(np.abs(series - series[-1]) > band)[0]
+    return int(outside[-1]) + 1 if len(outside) else 0
+
+class GoldenBaseline:
+    """
+    Reference run for one plan: per-step golden curves with precomputed
+    tolerance envelopes and recovery (settling) times. New runs are aligned
+    to it step by step and compared with array ops only.
+    """
+    def __init__(self, step_names, steps, rel_tol=0.05, run_id=None):
+        self.step_names = step_names
+        self.steps = steps # {step: {signal: {"ref", "lower", "upper", "settle"}}}
+        self.rel_tol = rel_tol
+        self.run_id = run_id
+
+    @classmethod
+    def from_telemetry(cls, telemetry, step_names, rel_tol=0.05, run_id=None):
+        steps = {}
+        for step, series in split_steps(telemetry).items():
+            steps[step] = {}
+            for signal, ref in series.items():
+                band = np.maximum(ABS_TOLERANCE[signal], rel_tol * np.abs(ref))
+                steps[step][signal] = {
+                    "ref": ref,
+                    "lower": ref - band,
+                    "upper": ref + band,
+                    "settle": settle_ticks(ref, ABS_TOLERANCE[signal], rel_tol),
+                }
+        return cls(list(step_names), steps, rel_tol, run_id)
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        arrays = {
+            "step_names": np.array(self.step_names, dtype=str),
+            "rel_tol": np.array(self.rel_tol),
+            "run_id": np.array(self.run_id or ""),
+        }
+        for step, signals in self.steps.items():
+            for signal, curve in signals.items():
+                for key, value in curve.items():
+                    arrays[f"{step}/{signal}/{key}"] = np.asarray(value)
+        np.savez_compressed(path, **arrays)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            steps = {}
+            for key in data.files:
+                if "/" not in key:
+                    continue
+                step, signal, field = key.split("/")
+                value = data[key]
+                steps.setdefault(int(step), {}).setdefault(signal, {})[field] = int(value) if field == "settle" else value
+            return cls([str(n) for n in data["step_names"]], steps, float(data["rel_tol"]), str(data["run_id"]) or None)
+
+    def compare(self, telemetry, max_outside=0.10, recovery_tol=0.05):
+        """
+        Returns (regressed step names, findings). A signal regresses when more
+        than `max_outside` of a step falls outside the golden envelope in its
+        REGRESSION_DIRECTION, or when it takes more than `recovery_tol` longer
+        to settle than the golden run. Excursions the other way (e.g. a cooler
+        run), and slow settling from that side, are returned as findings
+        without regressing the step.
+        """
+        regressed, findings = [], []
+        for step, series in split_steps(telemetry).items():
+            golden = self.steps.get(step)
+            if golden is None:
+                continue
+            name = self.step_names[step] if step < len(self.step_names) else f"step_{step}"
+            for signal, values in series.items():
+                curve = golden[signal]
+                ref = curve["ref"]
+                # Align to the golden step length before comparing
+                if len(values) != len(ref):
+                    values = np.interp(np.linspace(0, 1, len(ref)), np.linspace(0, 1, len(values)), values)
+
+                direction = REGRESSION_DIRECTION[signal]
+                above, below = values > curve["upper"], values < curve["lower"]
+                worse, better = (above, below) if direction > 0 else (below, above)
+                for outside, regression in ((worse, True), (better, False)):
+                    fraction = outside.mean() if len(outside) else 0.0
+                    if fraction <= max_outside:
+                        continue
+                    deviation = values - ref
+                    worst = int((deviation * (direction if regression else -direction)).argmax())
+                    if regression:
+                        findings.append(f"Baseline regression in '{name}': {signal} outside golden band for "
+                                        f"{fraction:.0%} of step (worst {deviation[worst]:+.2f} {UNITS[signal]})")
+                        regressed.append(name)
+                    else:
+                        findings.append(f"Baseline deviation in '{name}': {signal} outside golden band on the "
+                                        f"safe side for {fraction:.0%} of step ({deviation[worst]:+.2f} {UNITS[signal]}; not a regression)")
+
+                settle = settle_ticks(values, ABS_TOLERANCE[signal], self.rel_tol)
+                if curve["settle"] > 1 and settle > curve["settle"] * (1 + recovery_tol):
+                    slower = (settle - curve["settle"]) / curve["settle"]
+                    # Settling longer from the safe side of the band is not a regression
+                    if worse.any() or not better.any():
+                        findings.append(f"Baseline regression in '{name}': {signal} {slower:.0%} slower to recover "
+                                        f"({settle} vs {curve['settle']} ticks)")
+                        regressed.append(name)
+                    else:
+                        findings.append(f"Baseline deviation in '{name}': {signal} {slower:.0%} slower to settle "
+                                        f"from the safe side ({settle} vs {curve['settle']} ticks; not a regression)")
+        return list(dict.fromkeys(regressed)), findings
+
+@lru_cache(maxsize=32)
+def _load_cached(path, mtime):
+    return GoldenBaseline.load(path)
+
+def load_baseline(plan_path, baseline_dir=BASELINE_DIR):
+    """
+    Cached golden baseline for a plan, or None if none has been recorded.
+    """
+    path = baseline_path(plan_path, baseline_dir)
+    if not os.path.exists(path):
+        return None
+    return _load_cached(path, os.path.getmtime(path))
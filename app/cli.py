@@ -3,40 +3,201 @@ import sys
 import os
 from datetime import datetime
 from .utils import setup_logging
+from .distributed import Coordinator, Worker, build_jobs, DEFAULT_PORT
+from .pipeline import RunPipeline
+from .reanalyze import reanalyze_archive, load_metrics
+from .baseline import GoldenBaseline, baseline_path
 from .runner import TestRunner
-from .rca import RootCauseAnalyzer
-from .report import ReportGenerator
+from .profiler import SamplingProfiler, phase_table
+from .report import append_report_section
+from .fuzz import FaultFuzzer, TARGETS, write_reproducers
 
 def main():
+    argv = sys.argv[1:]
+    if argv and argv[0] in COMMANDS:
+        COMMANDS[argv[0]](argv[1:])
+        return
+
     parser = argparse.ArgumentParser(description="ForgeLab-RTP: Hardware Validation Platform")
-    parser.add_argument("--plan", type=str, required=True, help="Path to YAML test plan")
-    args = parser.parse_args()
+    parser.add_argument("--plan", type=str, nargs="+", required=True, help="Path(s) to YAML test plan(s)")
+    parser.add_argument("--correlate", action="store_true", help="Rank likely causes by lagged cross-correlation")
+    parser.add_argument("--queue-size", type=int, default=2, help="Runs buffered between pipeline stages")
+    parser.add_argument("--baseline", action="store_true", help="Compare each run against its plan's golden baseline")
+    parser.add_argument("--profile", action="store_true",
+                        help="Sample the pipeline and write flamegraph stacks + cost tables (runs without the per-tick pacing sleep)")
+    parser.add_argument("--profile-interval", type=float, default=0.005, help="Profiler sampling interval in seconds")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for stochastic fault schedules (default: plan 'seed:' or 0)")
+    args = parser.parse_args(argv)
 
-    if not os.path.exists(args.plan):
-        print(f"Error: Plan file '{args.plan}' not found.")
-        sys.exit(1)
+    for plan in args.plan:
+        if not os.path.exists(plan):
+            print(f"Error: Plan file '{plan}' not found.")
+            sys.exit(1)
 
     # Setup
     logger, log_file = setup_logging()
     run_id = os.path.basename(log_file).replace(".json", "")
-    
-    # Execution
-    runner = TestRunner(args.plan)
+    if len(args.plan) == 1:
+        runs = [(run_id, args.plan[0])]
+    else:
+        runs = [(f"{run_id}_{idx:02d}", plan) for idx, plan in enumerate(args.plan, start=1)]
+
+    profiler = SamplingProfiler(args.profile_interval).start() if args.profile else None
+
+    # Execution -> Analysis -> Reporting, overlapped across runs. The pacing
+    # sleep has no Python frame, so a profiled run would sample it as work
+    pipeline = RunPipeline(runs, correlate=args.correlate, realtime=not args.profile, queue_size=args.queue_size,
+                           baseline=args.baseline, profile=args.profile, seed=args.seed)
+    results = pipeline.run()
+
+    if profiler:
+        profiler.stop()
+        stacks_file = os.path.join("reports", f"{run_id}_profile.folded")
+        profiler.write_collapsed(stacks_file)
+        lines = phase_table(profiler.phase_breakdown(), profiler.samples)
+        scope = "this run" if len(results) == 1 else f"whole batch of {len(results)} runs"
+        for result in results:
+            if result['error'] is None:
+                # The report phase finishes after its own table is written
+                report_time = [f"Report phase wall time: {result['timings']['report']:.4f}s", ""]
+                append_report_section(result['run_id'], f"### Sampled Phase Breakdown ({scope})", report_time + lines)
+        logger.info("Profile phase breakdown:\n" + "\n".join(lines))
+        logger.info(f"Collapsed stacks written to {stacks_file} (flamegraph.pl / speedscope)")
+
+    # Exit Code
+    sys.exit(1 if any(r['error'] or r['failed_steps'] for r in results) else 0)
+
+def coordinator_main(argv):
+    parser = argparse.ArgumentParser(prog="python -m app coordinator",
+                                     description="Serve a plan x seed job matrix to remote workers")
+    parser.add_argument("--plan", type=str, nargs="+", required=True, help="Paths to YAML test plans")
+    parser.add_argument("--seeds", type=int, default=1, help="Number of seeds per plan (0..N-1); seeds only vary stochastic (rate) fault schedules")
+    parser.add_argument("--host", type=str, default="0.0.0.0", help="Interface to listen on")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="TCP port to listen on")
+    parser.add_argument("--prefetch", type=int, default=2, help="Jobs kept outstanding per worker")
+    parser.add_argument("--heartbeat-timeout", type=float, default=15.0, help="Seconds before a silent worker is declared lost")
+    parser.add_argument("--max-retries", type=int, default=2, help="Times a lost job is requeued")
+    parser.add_argument("--summary", type=str, default=None, help="JSONL file receiving per-run summaries")
+    args = parser.parse_args(argv)
+
+    for plan in args.plan:
+        if not os.path.exists(plan):
+            print(f"Error: Plan file '{plan}' not found.")
+            sys.exit(1)
+
+    logger, log_file = setup_logging()
+    summary_path = args.summary or os.path.join(
+        "reports", os.path.basename(log_file).replace(".json", "_summaries.jsonl"))
+
+    coordinator = Coordinator(
+        build_jobs(args.plan, range(args.seeds)),
+        host=args.host,
+        port=args.port,
+        prefetch=args.prefetch,
+        heartbeat_timeout=args.heartbeat_timeout,
+        max_retries=args.max_retries,
+        summary_path=summary_path,
+    )
+    results, failed = coordinator.run()
+    logger.info(f"Run summaries written to {summary_path}")
+
+    any_fail = failed or any(r['status'] != "PASS" for r in results.values())
+    sys.exit(1 if any_fail else 0)
+
+def worker_main(argv):
+    parser = argparse.ArgumentParser(prog="python -m app worker",
+                                     description="Execute jobs handed out by a coordinator")
+    parser.add_argument("--host", type=str, required=True, help="Coordinator host")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Coordinator port")
+    parser.add_argument("--name", type=str, default=None, help="Worker name (default: hostname-pid)")
+    parser.add_argument("--heartbeat", type=float, default=5.0, help="Heartbeat interval in seconds")
+    parser.add_argument("--realtime", action="store_true", help="Keep the per-tick sleep of interactive runs")
+    args = parser.parse_args(argv)
+
+    setup_logging()
+    worker = Worker(args.host, args.port, name=args.name,
+                    heartbeat_interval=args.heartbeat, realtime=args.realtime)
     try:
-        telemetry, failed_steps = runner.execute()
-    except Exception as e:
-        logger.exception("Fatal error during execution")
+        worker.run()
+    except OSError as e:
+        print(f"Error: cannot reach coordinator at {args.host}:{args.port}: {e}")
         sys.exit(1)
 
-    # Analysis
-    logger.info("Running Root Cause Analysis...")
-    rca = RootCauseAnalyzer(telemetry)
-    findings = rca.analyze()
+def reanalyze_main(argv):
+    parser = argparse.ArgumentParser(prog="python -m app reanalyze",
+                                     description="Re-score archived runs with the current criteria and RCA rules")
+    parser.add_argument("--reports", type=str, default="reports", help="Directory holding *_metrics.csv and the run index")
+    parser.add_argument("--run", type=str, nargs="+", default=None, help="Only these run IDs (default: all)")
+    parser.add_argument("--jobs", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--correlate", action="store_true", help="Rank likely causes by lagged cross-correlation")
+    parser.add_argument("--baseline", action="store_true", help="Compare runs against their plan's golden baseline")
+    args = parser.parse_args(argv)
 
-    # Reporting
-    logger.info("Generating Reports...")
-    reporter = ReportGenerator(run_id, telemetry, findings, failed_steps)
-    reporter.generate()
+    if not os.path.isdir(args.reports):
+        print(f"Error: Reports directory '{args.reports}' not found.")
+        sys.exit(1)
 
-    # Exit Code
-    sys.exit(1 if failed_steps else 0)
+    setup_logging()
+    entries = reanalyze_archive(args.reports, run_ids=args.run, correlate=args.correlate, jobs=args.jobs,
+                                baseline=args.baseline)
+    for entry in entries:
+        print(f"{entry['run_id']}: {entry.get('status', 'UNKNOWN')} {entry.get('failed_steps', [])}")
+
+def baseline_main(argv):
+    parser = argparse.ArgumentParser(prog="python -m app baseline",
+                                     description="Record a golden run for a plan")
+    parser.add_argument("--plan", type=str, required=True, help="Path to YAML test plan")
+    parser.add_argument("--run", type=str, default=None, help="Promote this archived run ID (default: simulate the plan now)")
+    parser.add_argument("--reports", type=str, default="reports", help="Directory holding archived runs")
+    parser.add_argument("--rel-tol", type=float, default=0.05, help="Relative tolerance band around the golden curves")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for stochastic fault schedules (default: plan 'seed:' or 0)")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.plan):
+        print(f"Error: Plan file '{args.plan}' not found.")
+        sys.exit(1)
+
+    logger, _ = setup_logging()
+    runner = TestRunner(args.plan, realtime=False, seed=args.seed)
+    if args.run:
+        metrics = os.path.join(args.reports, f"{args.run}_metrics.csv")
+        if not os.path.exists(metrics):
+            print(f"Error: Metrics file '{metrics}' not found.")
+            sys.exit(1)
+        telemetry = load_metrics(metrics)
+        if not telemetry or 'step' not in telemetry[0]:
+            print(f"Error: '{metrics}' has no per-step telemetry to baseline.")
+            sys.exit(1)
+    else:
+        telemetry, _ = runner.execute()
+
+    step_names = [step.get('name') for step in runner.test_plan.get('steps', [])]
+    path = baseline_path(args.plan)
+    GoldenBaseline.from_telemetry(telemetry, step_names, rel_tol=args.rel_tol, run_id=args.run).save(path)
+    logger.info(f"Golden baseline written to {path}")
+
+def fuzz_main(argv):
+    parser = argparse.ArgumentParser(prog="python -m app fuzz",
+                                     description="Search fault-injection sequences for failing plans")
+    parser.add_argument("--target", type=str, choices=sorted(TARGETS), default="os_critical", help="Failure to search for")
+    parser.add_argument("--budget", type=int, default=5000, help="Maximum candidates to execute")
+    parser.add_argument("--time-limit", type=float, default=None, help="Stop after this many seconds")
+    parser.add_argument("--seed", type=int, default=0, help="Search RNG seed")
+    parser.add_argument("--max-steps", type=int, default=8, help="Maximum fault steps per candidate")
+    parser.add_argument("--out", type=str, default=os.path.join("reports", "fuzz"), help="Directory for reproducer plans")
+    args = parser.parse_args(argv)
+
+    logger, _ = setup_logging()
+    fuzzer = FaultFuzzer(target=args.target, seed=args.seed, max_steps=args.max_steps)
+    reproducers = fuzzer.run(budget=args.budget, time_limit=args.time_limit)
+    for path in write_reproducers(reproducers, args.out, args.target):
+        logger.info(f"Reproducer plan written: {path}")
+    sys.exit(1 if reproducers else 0)
+
+COMMANDS = {
+    "coordinator": coordinator_main,
+    "worker": worker_main,
+    "reanalyze": reanalyze_main,
+    "baseline": baseline_main,
+    "fuzz": fuzz_main,
+}
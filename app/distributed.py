@@ -0,0 +1,405 @@
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+import yaml
+
+from .runner import TestRunner
+from .rca import RootCauseAnalyzer
+from .report import ReportGenerator
+
+logger = logging.getLogger("ForgeLab")
+
+DEFAULT_PORT = 7420
+
+# Wire protocol: one JSON object per line over TCP.
+#   worker -> coordinator: hello, heartbeat, result, stolen
+#   coordinator -> worker: jobs, steal, shutdown
+
+
+def send_message(sock, lock, message):
+    data = (json.dumps(message) + "\n").encode("utf-8")
+    with lock:
+        sock.sendall(data)
+
+
+def read_messages(sock):
+    """
+    Yields decoded messages until the peer disconnects.
+    """
+    stream = sock.makefile("rb")
+    try:
+        for line in stream:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+    except (OSError, ValueError):
+        return
+    finally:
+        stream.close()
+
+
+def build_jobs(plan_paths, seeds):
+    """
+    Expands plans x seeds into job dicts. Plans are shipped inline so workers
+    do not need the same checkout layout as the coordinator.
+    """
+    jobs = []
+    for plan_path in plan_paths:
+        with open(plan_path, 'r') as f:
+            plan = yaml.safe_load(f)
+        stem = os.path.splitext(os.path.basename(plan_path))[0]
+        for seed in seeds:
+            jobs.append({
+                "job_id": f"{len(jobs):05d}_{stem}_s{seed}",
+                "plan_path": plan_path,
+                "plan": plan,
+                "seed": seed,
+            })
+    return jobs
+
+
+def run_job(job, output_dir="reports", realtime=False):
+    """
+    Runs one job through the TestRunner -> RCA -> report pipeline and
+    returns the per-run summary streamed back to the coordinator.
+    """
+    run_id = f"run_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{job['job_id']}"
+    start = time.time()
+
+    runner = TestRunner(job['plan_path'], test_plan=job['plan'], realtime=realtime, seed=job['seed'])
+    telemetry, failed_steps = runner.execute()
+    findings = RootCauseAnalyzer(telemetry).analyze()
+    ReportGenerator(run_id, telemetry, findings, failed_steps, output_dir=output_dir,
+                    test_plan=job['plan'], plan_path=job['plan_path'], seed=job['seed']).generate()
+
+    return {
+        "job_id": job['job_id'],
+        "run_id": run_id,
+        "plan": job['plan'].get('name', job['plan_path']),
+        "seed": job['seed'],
+        "status": "FAIL" if failed_steps else "PASS",
+        "failed_steps": failed_steps,
+        "findings": findings,
+        "max_temp": max((d['cpu_temp_c'] for d in telemetry), default=None),
+        "min_voltage": min((d['psu_voltage_v'] for d in telemetry), default=None),
+        "duration_s": round(time.time() - start, 3),
+    }
+
+
+class _WorkerHandle:
+    def __init__(self, name, sock):
+        self.name = name
+        self.sock = sock
+        self.send_lock = threading.Lock()
+        self.assigned = [] # job ids, oldest (running) first
+        self.last_seen = time.monotonic()
+        self.steal_pending = False
+
+
+class Coordinator:
+    """
+    Distributes (plan, seed) jobs to workers over TCP.
+
+    Workers keep up to `prefetch` jobs outstanding. When the queue runs dry,
+    idle workers steal half of the busiest worker's not-yet-started backlog.
+    Jobs held by a worker that disconnects or misses heartbeats are requeued
+    up to `max_retries` times.
+    """
+    def __init__(self, jobs, host="0.0.0.0", port=DEFAULT_PORT, prefetch=2,
+                 heartbeat_timeout=15.0, max_retries=2, summary_path=None):
+        self.jobs = {job['job_id']: job for job in jobs}
+        self.pending = deque(self.jobs)
+        self.attempts = {job_id: 0 for job_id in self.jobs}
+        self.results = {}
+        self.failed = {}
+        self.host = host
+        self.port = port
+        self.prefetch = max(1, prefetch)
+        self.heartbeat_timeout = heartbeat_timeout
+        self.max_retries = max_retries
+        self.summary_path = summary_path
+        self.workers = {}
+        self.lock = threading.Lock()
+        self.done = threading.Event()
+        self._summary_file = None
+        self._outbox = [] # (handle, message) queued under self.lock, sent by _flush()
+
+    def run(self):
+        if self.summary_path:
+            os.makedirs(os.path.dirname(self.summary_path) or ".", exist_ok=True)
+            self._summary_file = open(self.summary_path, 'a')
+
+        server = socket.create_server((self.host, self.port))
+        server.settimeout(0.5)
+        self.port = server.getsockname()[1]
+        logger.info(f"Coordinator listening on {self.host}:{self.port} with {len(self.jobs)} jobs")
+
+        threading.Thread(target=self._monitor, daemon=True).start()
+        start = time.time()
+        if not self.jobs:
+            self.done.set()
+        try:
+            while not self.done.is_set():
+                try:
+                    conn, addr = server.accept()
+                except socket.timeout:
+                    continue
+                threading.Thread(target=self._serve, args=(conn, addr), daemon=True).start()
+        finally:
+            server.close()
+            with self.lock:
+                handles = list(self.workers.values())
+                self.workers.clear()
+            for handle in handles:
+                self._send(handle, {"type": "shutdown"})
+                self._close(handle)
+            if self._summary_file:
+                self._summary_file.close()
+
+        elapsed = time.time() - start
+        logger.info(f"Coordinator finished: {len(self.results)} completed, {len(self.failed)} failed "
+                    f"in {elapsed:.2f}s")
+        return self.results, self.failed
+
+    def _serve(self, conn, addr):
+        messages = read_messages(conn)
+        hello = next(messages, None)
+        if not hello or hello.get('type') != "hello":
+            conn.close()
+            return
+
+        with self.lock:
+            name = hello.get('worker') or f"{addr[0]}:{addr[1]}"
+            if name in self.workers:
+                name = f"{name}@{addr[1]}"
+            handle = _WorkerHandle(name, conn)
+            self.workers[name] = handle
+            logger.info(f"Worker joined: {name}")
+            self._dispatch()
+        self._flush()
+
+        for message in messages:
+            with self.lock:
+                handle.last_seen = time.monotonic()
+                kind = message.get('type')
+                if kind == "result":
+                    self._on_result(handle, message)
+                elif kind == "stolen":
+                    self._on_stolen(handle, message.get('job_ids', []))
+            self._flush()
+            if self.done.is_set():
+                break
+
+        with self.lock:
+            self._drop(handle, "disconnected")
+        self._flush()
+
+    def _on_result(self, handle, message):
+        job_id = message.get('job_id')
+        if job_id in handle.assigned:
+            handle.assigned.remove(job_id)
+        if job_id in self.results or job_id in self.failed or job_id not in self.jobs:
+            return
+
+        if message.get('error'):
+            self.failed[job_id] = message['error']
+            logger.error(f"Job {job_id} errored on {handle.name}: {message['error']}")
+        else:
+            summary = dict(message['summary'], worker=handle.name)
+            self.results[job_id] = summary
+            if self._summary_file:
+                self._summary_file.write(json.dumps(summary) + "\n")
+                self._summary_file.flush()
+            logger.info(f"[{len(self.results) + len(self.failed)}/{len(self.jobs)}] "
+                        f"{job_id} {summary['status']} on {handle.name}")
+
+        self._check_done()
+        self._dispatch()
+
+    def _on_stolen(self, handle, job_ids):
+        handle.steal_pending = False
+        for job_id in reversed(job_ids):
+            if job_id in handle.assigned:
+                handle.assigned.remove(job_id)
+                self.pending.appendleft(job_id)
+        if job_ids:
+            logger.debug(f"Stole {len(job_ids)} job(s) from {handle.name}")
+        self._dispatch()
+
+    def _dispatch(self):
+        # Caller holds self.lock and calls _flush() after releasing it.
+        # Least-loaded workers are served first so stolen jobs land on the
+        # idle worker instead of bouncing back.
+        for handle in sorted(self.workers.values(), key=lambda h: len(h.assigned)):
+            batch = []
+            while self.pending and len(handle.assigned) < self.prefetch:
+                job_id = self.pending.popleft()
+                handle.assigned.append(job_id)
+                batch.append(self.jobs[job_id])
+            if batch:
+                self._outbox.append((handle, {"type": "jobs", "jobs": batch}))
+
+        if self.pending:
+            return
+        idle = [h for h in self.workers.values() if not h.assigned]
+        victims = sorted(
+            (h for h in self.workers.values() if len(h.assigned) > 1 and not h.steal_pending),
+            key=lambda h: len(h.assigned), reverse=True,
+        )
+        for _, victim in zip(idle, victims):
+            victim.steal_pending = True
+            self._outbox.append((victim, {"type": "steal", "count": len(victim.assigned) // 2}))
+
+    def _drop(self, handle, reason):
+        # Caller holds self.lock and calls _flush() after releasing it
+        if self.workers.get(handle.name) is not handle:
+            return
+        del self.workers[handle.name]
+        self._close(handle)
+
+        for job_id in reversed(handle.assigned):
+            if job_id in self.results or job_id in self.failed:
+                continue
+            self.attempts[job_id] += 1
+            if self.attempts[job_id] > self.max_retries:
+                self.failed[job_id] = f"lost {self.attempts[job_id]} times (last: {reason})"
+                logger.error(f"Job {job_id} abandoned after {self.attempts[job_id]} lost attempts")
+            else:
+                self.pending.appendleft(job_id)
+        if handle.assigned:
+            logger.warning(f"Worker {handle.name} {reason}; requeued {len(handle.assigned)} job(s)")
+        else:
+            logger.info(f"Worker {handle.name} {reason}")
+        handle.assigned = []
+
+        self._check_done()
+        self._dispatch()
+
+    def _monitor(self):
+        interval = max(0.1, self.heartbeat_timeout / 3)
+        while not self.done.wait(interval):
+            now = time.monotonic()
+            with self.lock:
+                for handle in list(self.workers.values()):
+                    if now - handle.last_seen > self.heartbeat_timeout:
+                        self._drop(handle, "missed heartbeats")
+            self._flush()
+
+    def _check_done(self):
+        if len(self.results) + len(self.failed) == len(self.jobs):
+            self.done.set()
+
+    def _flush(self):
+        # Messages queued under the lock are sent after releasing it, so a
+        # stalled worker socket cannot block result handling for the others
+        with self.lock:
+            outbox, self._outbox = self._outbox, []
+        for handle, message in outbox:
+            self._send(handle, message)
+
+    def _send(self, handle, message):
+        try:
+            send_message(handle.sock, handle.send_lock, message)
+        except OSError as e:
+            logger.warning(f"Send to {handle.name} failed: {e}")
+
+    def _close(self, handle):
+        try:
+            handle.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        handle.sock.close()
+
+
+class Worker:
+    """
+    Pulls jobs from a coordinator, runs them locally and streams summaries back.
+    A background thread answers steal requests and sends heartbeats while a
+    job is executing.
+    """
+    def __init__(self, host, port=DEFAULT_PORT, name=None, output_dir="reports",
+                 heartbeat_interval=5.0, realtime=False):
+        self.host = host
+        self.port = port
+        self.name = name or f"{socket.gethostname()}-{os.getpid()}"
+        self.output_dir = output_dir
+        self.heartbeat_interval = heartbeat_interval
+        self.realtime = realtime
+        self.queue = deque()
+        self.cond = threading.Condition()
+        self.stopped = False
+        self.completed = 0
+
+    def run(self):
+        self.sock = socket.create_connection((self.host, self.port))
+        self.send_lock = threading.Lock()
+        send_message(self.sock, self.send_lock, {"type": "hello", "worker": self.name})
+        logger.info(f"Worker {self.name} connected to {self.host}:{self.port}")
+
+        threading.Thread(target=self._listen, daemon=True).start()
+        threading.Thread(target=self._heartbeat, daemon=True).start()
+
+        try:
+            while True:
+                with self.cond:
+                    while not self.queue and not self.stopped:
+                        self.cond.wait()
+                    if self.stopped:
+                        break
+                    job = self.queue.popleft()
+
+                message = {"type": "result", "job_id": job['job_id']}
+                try:
+                    message["summary"] = run_job(job, self.output_dir, self.realtime)
+                except Exception as e:
+                    logger.exception(f"Job {job['job_id']} failed")
+                    message["error"] = f"{type(e).__name__}: {e}"
+                try:
+                    send_message(self.sock, self.send_lock, message)
+                except OSError:
+                    logger.error("Lost connection to coordinator")
+                    break
+                self.completed += 1
+        finally:
+            with self.cond:
+                self.stopped = True
+            self.sock.close()
+
+        logger.info(f"Worker {self.name} exiting after {self.completed} job(s)")
+        return self.completed
+
+    def _listen(self):
+        for message in read_messages(self.sock):
+            kind = message.get('type')
+            if kind == "jobs":
+                with self.cond:
+                    self.queue.extend(message['jobs'])
+                    self.cond.notify()
+            elif kind == "steal":
+                with self.cond:
+                    count = min(message.get('count', 1), len(self.queue))
+                    stolen = [self.queue.pop()['job_id'] for _ in range(count)]
+                stolen.reverse()
+                send_message(self.sock, self.send_lock, {"type": "stolen", "job_ids": stolen})
+            elif kind == "shutdown":
+                break
+        with self.cond:
+            self.stopped = True
+            self.cond.notify()
+
+    def _heartbeat(self):
+        while True:
+            time.sleep(self.heartbeat_interval)
+            with self.cond:
+                if self.stopped:
+                    return
+            try:
+                send_message(self.sock, self.send_lock, {"type": "heartbeat"})
+            except OSError:
+                return
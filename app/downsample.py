@@ -0,0 +1,191 @@
+import threading
+
+import numpy as np
+
+# Numeric telemetry columns worth charting
+PYRAMID_SIGNALS = ["cpu_temp_c", "cpu_freq_ghz", "fan_rpm", "psu_voltage_v", "psu_power_w", "active_load"]
+
+# Whole-run scalars stored per signal, so summaries never touch the levels
+STAT_FIELDS = ("min", "max", "mean", "first", "last")
+
+
+def lttb(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets downsampling. Keeps the first and last
+    points and, per bucket, the point forming the largest triangle with the
+    previously kept point and the next bucket's mean. Returns indices into x/y.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    kept = np.empty(n_out, dtype=np.int64)
+    kept[0], kept[-1] = 0, n - 1
+
+    prev = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], max(edges[i + 1], edges[i] + 1)
+        nxt_lo, nxt_hi = hi, edges[i + 2] if i + 2 < len(edges) else n
+        nxt_x = x[nxt_lo:max(nxt_hi, nxt_lo + 1)].mean()
+        nxt_y = y[nxt_lo:max(nxt_hi, nxt_lo + 1)].mean()
+
+        area = np.abs((x[prev] - nxt_x) * (y[lo:hi] - y[prev]) - (x[prev] - x[lo:hi]) * (nxt_y - y[prev]))
+        prev = lo + int(area.argmax())
+        kept[i + 1] = prev
+    return kept
+
+
+class TelemetryPyramid:
+    """
+    Per-signal min/max/mean pyramid over the tick axis.
+
+    Level 0 is the raw series; each further level aggregates `factor` buckets
+    of the level below. Range queries pick the finest level that fits in the
+    requested point budget, so cost depends on the budget, not run length.
+    Loaded pyramids read each level from the archive on first use.
+    """
+    def __init__(self, levels, length, factor=4, stats=None, source=None):
+        self.levels = levels # signal -> [{"min", "max", "mean"} arrays per level, None until loaded]
+        self.length = length
+        self.factor = factor
+        self.stats = stats if stats is not None else {} # signal -> {STAT_FIELDS: float}
+        self._source = source # open NpzFile backing unloaded levels
+        self._lock = threading.Lock()
+
+    @classmethod
+    def build(cls, telemetry, signals=PYRAMID_SIGNALS, factor=4, min_buckets=64):
+        length = len(telemetry)
+        levels, stats = {}, {}
+        for signal in signals:
+            if not telemetry or signal not in telemetry[0]:
+                continue
+            raw = np.fromiter((d[signal] for d in telemetry), dtype=np.float64, count=length)
+            levels[signal] = cls._build_levels(raw, factor, min_buckets)
+            stats[signal] = cls._stats(raw)
+        return cls(levels, length, factor, stats)
+
+    @staticmethod
+    def _stats(raw):
+        values = (raw.min(), raw.max(), raw.mean(), raw[0], raw[-1])
+        return dict(zip(STAT_FIELDS, (float(v) for v in values)))
+
+    @staticmethod
+    def _build_levels(raw, factor, min_buckets):
+        vmin, vmax, vsum, count = raw, raw, raw, np.ones(len(raw))
+        levels = [{"min": raw, "max": raw, "mean": raw}]
+        while len(vmin) > min_buckets:
+            pad = (-len(vmin)) % factor
+            if pad:
+                vmin = np.concatenate([vmin, np.full(pad, np.inf)])
+                vmax = np.concatenate([vmax, np.full(pad, -np.inf)])
+                vsum = np.concatenate([vsum, np.zeros(pad)])
+                count = np.concatenate([count, np.zeros(pad)])
+            vmin = vmin.reshape(-1, factor).min(axis=1)
+            vmax = vmax.reshape(-1, factor).max(axis=1)
+            vsum = vsum.reshape(-1, factor).sum(axis=1)
+            count = count.reshape(-1, factor).sum(axis=1)
+            levels.append({"min": vmin, "max": vmax, "mean": vsum / count})
+        return levels
+
+    def save(self, path):
+        arrays = {"length": np.array(self.length), "factor": np.array(self.factor)}
+        for signal, stats in self.stats.items():
+            arrays[f"{signal}/stats"] = np.array([stats[field] for field in STAT_FIELDS])
+        for signal, levels in self.levels.items():
+            for idx in range(len(levels)):
+                level = self._level(signal, idx)
+                for stat in ("min", "max", "mean"):
+                    if idx == 0 and stat != "mean":
+                        continue # raw level stores the series once
+                    arrays[f"{signal}/{idx}/{stat}"] = level[stat]
+        np.savez_compressed(path, **arrays)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Opens a saved pyramid. Only the per-signal stats are read here; level
+        arrays are decompressed on first use, so the raw series is only read
+        when a query zooms in far enough to need it.
+        """
+        data = np.load(path)
+        length = int(data["length"])
+        factor = int(data["factor"])
+        depth, stats = {}, {}
+        for key in data.files:
+            if "/" not in key:
+                continue
+            signal, part = key.split("/")[:2]
+            if part == "stats":
+                stats[signal] = dict(zip(STAT_FIELDS, (float(v) for v in data[key])))
+            else:
+                depth[signal] = max(depth.get(signal, 0), int(part) + 1)
+        levels = {signal: [None] * count for signal, count in depth.items()}
+        return cls(levels, length, factor, stats, source=data)
+
+    def _level(self, signal, idx):
+        levels = self.levels[signal]
+        if levels[idx] is None:
+            with self._lock:
+                if levels[idx] is None:
+                    if idx == 0:
+                        raw = self._source[f"{signal}/0/mean"]
+                        levels[0] = {"min": raw, "max": raw, "mean": raw}
+                    else:
+                        levels[idx] = {stat: self._source[f"{signal}/{idx}/{stat}"] for stat in ("min", "max", "mean")}
+        return levels[idx]
+
+    def signals(self):
+        return list(self.levels)
+
+    def summary(self, signal):
+        """
+        Whole-run min/avg/max/trend from the stats saved at build time, plus the sample count.
+        """
+        if signal not in self.levels or self.length == 0:
+            return None
+        stats = self.stats.get(signal)
+        if stats is None:
+            # Pyramids saved before stats were recorded
+            stats = self.stats[signal] = self._stats(self._level(signal, 0)["mean"])
+        first, last = stats["first"], stats["last"]
+        trend = "↗" if last > first else ("↘" if last < first else "→")
+        return {"min": stats["min"], "max": stats["max"], "avg": stats["mean"],
+                "trend": trend, "samples": self.length}
+
+    def query(self, signal, start=0, end=None, max_points=1000, method="minmax"):
+        """
+        Returns at most `max_points` points covering ticks [start, end).
+
+        method="minmax" returns bucket envelopes (t, min, max, mean) from the
+        finest level that fits; method="lttb" returns a shape-preserving line
+        (t, value) chosen by LTTB over a bounded level.
+        """
+        levels = self.levels[signal]
+        end = self.length if end is None else min(end, self.length)
+        start = max(0, start)
+        if end <= start:
+            empty = np.array([])
+            return {"t": empty, "min": empty, "max": empty, "mean": empty}
+
+        max_points = max(1, max_points)
+        # Finest level fitting the budget (minmax) or a few times it (lttb input)
+        budget = max_points if method == "minmax" else max_points * self.factor
+        idx, size, lo, hi = 0, 1, start, end
+        while idx < len(levels) - 1 and hi - lo > budget:
+            idx += 1
+            size = self.factor ** idx
+            lo, hi = start // size, -(-end // size)
+
+        level = self._level(signal, idx)
+        t = (np.arange(lo, hi) * size + (size - 1) / 2.0).clip(max=self.length - 1)
+        vmin, vmax, vmean = level["min"][lo:hi], level["max"][lo:hi], level["mean"][lo:hi]
+
+        if method == "lttb":
+            keep = lttb(t, vmean, max_points)
+            return {"t": t[keep], "value": vmean[keep]}
+        if len(t) > max_points:
+            # Coarsest level still too dense for the budget; stride it
+            keep = np.linspace(0, len(t) - 1, max_points).astype(np.int64)
+            t, vmin, vmax, vmean = t[keep], vmin[keep], vmax[keep], vmean[keep]
+        return {"t": t, "min": vmin, "max": vmax, "mean": vmean}
@@ -1,20 +1,109 @@
-class FailureInjector:
+import random
+from array import array
+
+INJECTION_TYPES = ("fan_stall", "psu_sag", "overheat", "fw_hang")
+INJECTION_BITS = {name: 1 << i for i, name in enumerate(INJECTION_TYPES)}
+
+class InjectionSchedule:
     """
-    Manages active failure injections based on test plan instructions.
+    Injection state for every tick of a run, compiled before execution.
+
+    masks[t] is a bitmask over INJECTION_TYPES and severity[name][t] the
+    0..1 fault strength. Both are `array` buffers, so vectorized consumers
+    can wrap them without copying (e.g. numpy.frombuffer(schedule.masks, numpy.uint8)).
+
+    Fault specs (inject_failure step params or plan-level `faults` entries):
+      delay     - ticks between the inject point and onset
+      period    - duty-cycle length in ticks
+      duty      - fraction of each period the fault is active (default 0.5)
+      rate      - Poisson glitches per tick, each lasting `glitch` ticks
+      ramp      - ticks to reach full severity
+      severity  - peak strength (default 1.0)
+    Plan-level entries also take `start` and optional `duration` in ticks.
     """
-    def __init__(self):
-        self.active_injections = {
-            "fan_stall": False,
-            "psu_sag": False,
-            "overheat": False,
-            "fw_hang": False
-        }
-
-    def set_injection(self, injection_type: str, state: bool):
-        if injection_type in self.active_injections:
-            self.active_injections[injection_type] = state
-            return True
-        return False
-
-    def get_active(self):
-        return self.active_injections
+    def __init__(self, ticks):
+        self.ticks = ticks
+        self.masks = array('B', bytes(ticks))
+        self.severity = {name: array('d', bytes(8 * ticks)) for name in INJECTION_TYPES}
+        self._labels = [str([name for name in INJECTION_TYPES if mask & INJECTION_BITS[name]])
+                        for mask in range(1 << len(INJECTION_TYPES))]
+
+    @classmethod
+    def compile(cls, steps, step_ticks, faults=(), seed=0):
+        """
+        Builds the schedule from plan steps (with the tick count each one
+        consumes) and any plan-level fault entries. Faults opened by
+        inject_failure stay active until the matching clear_failure.
+        """
+        rng = random.Random(seed)
+        schedule = cls(sum(step_ticks))
+
+        open_faults = {}
+        tick = 0
+        for step, ticks in zip(steps, step_ticks):
+            params = step.get('params', {}) or {}
+            kind = params.get('type')
+            if step.get('action') == 'inject_failure' and kind in INJECTION_BITS:
+                open_faults.setdefault(kind, (tick, params))
+            elif step.get('action') == 'clear_failure' and kind in open_faults:
+                start, spec = open_faults.pop(kind)
+                schedule._apply(kind, start, tick, spec, rng)
+            tick += ticks
+        for kind, (start, spec) in open_faults.items():
+            schedule._apply(kind, start, schedule.ticks, spec, rng)
+
+        for fault in faults or []:
+            kind = fault.get('type')
+            if kind not in INJECTION_BITS:
+                continue
+            start = int(fault.get('start', 0))
+            end = start + int(fault['duration']) if 'duration' in fault else schedule.ticks
+            schedule._apply(kind, start, end, fault, rng)
+        return schedule
+
+    def _apply(self, kind, start, end, spec, rng):
+        onset = start + int(spec.get('delay', 0))
+        end = min(end, self.ticks)
+        if onset >= end:
+            return
+
+        if 'rate' in spec:
+            rate = float(spec['rate'])
+            glitch = max(1, int(spec.get('glitch', 1)))
+            active = set()
+            t = onset + rng.expovariate(rate) if rate > 0 else end
+            while t < end:
+                active.update(range(int(t), min(int(t) + glitch, end)))
+                t += rng.expovariate(rate)
+            active = sorted(active)
+        elif 'period' in spec:
+            period = max(1, int(spec['period']))
+            duty = float(spec.get('duty', 0.5))
+            # Any positive duty keeps at least one active tick; duty <= 0 never fires
+            on = max(1, round(duty * period)) if duty > 0 else 0
+            active = [t for t in range(onset, end) if (t - onset) % period < on]
+        else:
+            active = range(onset, end)
+
+        peak = float(spec.get('severity', 1.0))
+        ramp = int(spec.get('ramp', 0))
+        bit = INJECTION_BITS[kind]
+        severity = self.severity[kind]
+        for t in active:
+            level = peak * min(1.0, (t - onset + 1) / ramp) if ramp > 0 else peak
+            if level > severity[t]:
+                severity[t] = level
+            if level > 0:
+                self.masks[t] |= bit
+
+    def active(self, tick):
+        """
+        Injection map for VirtualHardware.update: active type -> severity.
+        """
+        mask = self.masks[tick]
+        if not mask:
+            return {}
+        return {name: self.severity[name][tick] for name in INJECTION_TYPES if mask & INJECTION_BITS[name]}
+
+    def label(self, mask):
+        return self._labels[mask]
@@ -0,0 +1,327 @@
+import copy
+import hashlib
+import json
+import logging
+import os
+import random
+import re
+import time
+
+import yaml
+
+from .failures import INJECTION_TYPES
+from .rca import RootCauseAnalyzer
+from .runner import TestRunner
+
+logger = logging.getLogger("ForgeLab.fuzz")
+
+# Failure targets, expressed as the step criteria a reproducer plan violates
+TARGETS = {
+    "os_critical": {"os_running": True},
+    "overtemp": {"max_temp": RootCauseAnalyzer.TEMP_CRITICAL},
+    "psu_sag": {"min_voltage": RootCauseAnalyzer.VOLTAGE_LOW},
+}
+
+BOOT_STEP = {"name": "Boot", "action": "boot", "duration": 5}
+LOADS = list(range(10, 101, 10))
+MAX_DURATION = 15
+# Consecutive already-seen candidates before the search space counts as exhausted
+MAX_DUPLICATES = 1000
+
+class FaultFuzzer:
+    """
+    Coverage-guided search over inject_failure / clear_failure / stress
+    sequences. Candidates that reach new throttle, OS-health, injection or
+    RCA-finding states, or end in an unseen VirtualHardware.state_key(), join
+    the corpus and are mutated further.
+
+    Explored states are deduplicated: after each step the run is keyed by
+    (state_key, open faults, remaining steps). When a key was already
+    simulated, the run stops there and reuses that suffix's outcome.
+    Sequences violating the target criteria are re-run exactly and shrunk to
+    a minimal reproducer plan.
+    """
+    def __init__(self, target="os_critical", seed=0, max_steps=8):
+        self.criteria = TARGETS[target]
+        self.target = target
+        self.rng = random.Random(seed)
+        self.max_steps = max_steps
+        self.coverage = set()
+        self.seen_states = set()
+        self.seen_sequences = set()
+        self.corpus = []
+        self.failures = {}
+        self.explored = {} # (state_key, open faults, suffix) -> (failed, features, first state, final state_key)
+        self.executed = 0
+        self.pruned = 0
+
+    def run(self, budget=1000, time_limit=None):
+        start = time.time()
+        duplicates = 0
+        # Keep the runner's per-step logging out of the hot loop; records from
+        # this module's child logger still reach the ForgeLab handlers
+        runner_logger = logging.getLogger("ForgeLab")
+        runner_logger.disabled = True
+        try:
+            while self.executed < budget:
+                if time_limit and time.time() - start > time_limit:
+                    break
+                steps = self._mutate(self.rng.choice(self.corpus)) if self.corpus else self._random_steps()
+                key = self._sequence_key(steps)
+                if key in self.seen_sequences:
+                    duplicates += 1
+                    if duplicates >= MAX_DUPLICATES:
+                        logger.info(f"No unseen candidates in {duplicates} tries; search space exhausted")
+                        break
+                    continue
+                duplicates = 0
+                self.seen_sequences.add(key)
+
+                failed, features, state = self._execute(steps)
+                new = (features - self.coverage) or state not in self.seen_states
+                self.coverage |= features
+                self.seen_states.add(state)
+                if new:
+                    self.corpus.append(steps)
+                if failed and new:
+                    self._record_failure(steps)
+        finally:
+            runner_logger.disabled = False
+
+        elapsed = time.time() - start
+        logger.info(f"Fuzzed {self.executed} candidates in {elapsed:.2f}s "
+                    f"({self.executed / max(elapsed, 1e-9):.0f}/s); corpus={len(self.corpus)}, "
+                    f"coverage={len(self.coverage)}, states={len(self.seen_states)}, "
+                    f"pruned={self.pruned}, reproducers={len(self.failures)}")
+        return [plan for _, plan in self.failures.values()]
+
+    def _plan(self, steps):
+        fuzz_steps = []
+        for idx, step in enumerate(steps, start=1):
+            step = dict(step, name=f"{idx:02d} {step['action']} {step['params'].get('type', '')}".strip())
+            step["criteria"] = dict(self.criteria)
+            fuzz_steps.append(step)
+        return {"name": f"Fuzz reproducer ({self.target})",
+                "description": "Minimal fault sequence found by python -m app fuzz",
+                "steps": [dict(BOOT_STEP)] + fuzz_steps}
+
+    def _execute(self, steps, prune=True):
+        """
+        Runs a candidate and returns (failed, coverage features, final state
+        key). With `prune`, the run stops at the first explored state and
+        takes the rest of its outcome from self.explored.
+        """
+        self.executed += 1
+        plan = self._plan(steps)
+        runner = TestRunner(None, test_plan=plan, realtime=False)
+        open_faults = self._open_faults(steps)
+        boundaries, hit = [], []
+
+        def on_step(step_index):
+            # Plan step 0 is boot, so steps[step_index:] are still to run
+            remaining = steps[step_index:]
+            if not prune or not remaining:
+                return False
+            key = (runner.hardware.state_key(), open_faults[step_index], self._sequence_key(remaining))
+            if key in self.explored:
+                hit.append(key)
+                return True
+            boundaries.append((key, step_index, runner.tick))
+            return False
+
+        telemetry, failed_steps = runner.execute(on_step)
+        names = {step['name']: idx for idx, step in enumerate(plan['steps'])}
+        failed_at = [names[name] for name in failed_steps]
+        items, states = self._feature_items(telemetry)
+
+        # Outcome of the part of the run that was not simulated
+        tail_failed, tail_features, final_state = False, set(), runner.hardware.state_key()
+        if hit:
+            self.pruned += 1
+            tail_failed, tail_features, first, final_state = self.explored[hit[0]]
+            if states and states[-1] != first:
+                tail_features = tail_features | {("transition", states[-1], first)}
+
+        for key, step_index, tick in boundaries:
+            self.explored[key] = (
+                any(idx > step_index for idx in failed_at) or tail_failed,
+                frozenset(feature for i, feature in items if i > tick or (i == tick and feature[0] != "transition"))
+                | tail_features,
+                states[tick],
+                final_state,
+            )
+
+        features = {feature for _, feature in items} | tail_features
+        return bool(failed_at) or tail_failed, features, final_state
+
+    @staticmethod
+    def _feature_items(telemetry):
+        # (tick, feature) pairs so suffixes of the run can be sliced out
+        items, states = [], []
+        for idx, sample in enumerate(telemetry):
+            current = (sample['cpu_throttle'], sample['os_health'], sample['injection_mask'])
+            items.append((idx, ("state", current)))
+            if states and states[-1] != current:
+                items.append((idx, ("transition", states[-1], current)))
+            states.append(current)
+        for finding in RootCauseAnalyzer(telemetry).analyze():
+            # Bucket findings by kind: strip measured values, keep the tick for slicing
+            match = re.match(r"^T=(\d+)s: (.*?)\s*(\(.*\))?$", finding)
+            if match:
+                items.append((int(match.group(1)), ("finding", match.group(2))))
+        return items, states
+
+    @staticmethod
+    def _open_faults(steps):
+        # open_faults[i]: faults injected and not yet cleared before steps[i]
+        active, result = set(), [frozenset()]
+        for step in steps:
+            kind = step['params'].get('type')
+            if step['action'] == "inject_failure":
+                active.add(kind)
+            elif step['action'] == "clear_failure":
+                active.discard(kind)
+            result.append(frozenset(active))
+        return result
+
+    def _fails(self, steps):
+        # Exact run: reproducers must not depend on the quantized state cache
+        return self._execute(steps, prune=False)[0]
+
+    def _record_failure(self, steps):
+        if not self._fails(steps):
+            return
+        minimal = self.shrink(steps)
+        # Reproducers differing only in durations/loads are the same fault
+        # ordering; keep the shortest one per ordering
+        signature = tuple((step['action'], step['params'].get('type')) for step in minimal)
+        ticks = sum(step['duration'] for step in minimal)
+        known = self.failures.get(signature)
+        if known is None or ticks < known[0]:
+            if known is None:
+                logger.info(f"New {self.target} reproducer: " + " -> ".join(
+                    f"{action}({kind})" if kind else action for action, kind in signature))
+            self.failures[signature] = (ticks, self._plan(minimal))
+
+    def shrink(self, steps):
+        """
+        Greedy delta-debugging: drop steps, turn injects into plain stress,
+        merge adjacent steps of the same kind, then shorten durations and
+        lower loads, repeating until no single reduction still fails.
+        """
+        changed = True
+        while changed:
+            changed = False
+            # Dropping an inject can turn a later clear into a no-op
+            steps = self._rewrite_noop_clears(steps)
+            for idx in reversed(range(len(steps))):
+                candidate = steps[:idx] + steps[idx + 1:]
+                if candidate and self._fails(candidate):
+                    steps, changed = candidate, True
+            for candidate in self._reductions(steps):
+                if self._fails(candidate):
+                    steps, changed = candidate, True
+                    break
+        return steps
+
+    def _reductions(self, steps):
+        # Candidate single-step reductions, most structural first
+        for idx, step in enumerate(steps):
+            if step['action'] == "inject_failure":
+                candidate = copy.deepcopy(steps)
+                candidate[idx] = {"action": "stress", "params": {"load": step['params']['load']},
+                                  "duration": step['duration']}
+                yield self._rewrite_noop_clears(candidate)
+        for idx in range(len(steps) - 1):
+            first, second = steps[idx], steps[idx + 1]
+            # A trailing stress step only extends whatever fault state the first step left
+            if second['action'] == "stress" or (first['action'], first['params'].get('type')) == \
+                    (second['action'], second['params'].get('type')):
+                merged = copy.deepcopy(first)
+                merged['duration'] = first['duration'] + second['duration']
+                merged['params']['load'] = max(first['params']['load'], second['params']['load'])
+                yield steps[:idx] + [merged] + steps[idx + 2:]
+        for idx, step in enumerate(steps):
+            for field, smaller in (("duration", step['duration'] // 2),
+                                   ("load", step['params']['load'] - 10)):
+                current = step['duration'] if field == "duration" else step['params']['load']
+                if smaller < 1 or smaller >= current:
+                    continue
+                candidate = copy.deepcopy(steps)
+                if field == "duration":
+                    candidate[idx]['duration'] = smaller
+                else:
+                    candidate[idx]['params']['load'] = smaller
+                yield candidate
+
+    @staticmethod
+    def _rewrite_noop_clears(steps):
+        """
+        Rewrites clear_failure steps for faults that are not active as plain
+        stress steps; the schedule, and so the run, is unchanged.
+        """
+        steps = copy.deepcopy(steps)
+        active = set()
+        for step in steps:
+            kind = step['params'].get('type')
+            if step['action'] == "inject_failure":
+                active.add(kind)
+            elif step['action'] == "clear_failure":
+                if kind in active:
+                    active.discard(kind)
+                else:
+                    step['action'] = "stress"
+                    del step['params']['type']
+        return steps
+
+    def _random_step(self):
+        action = self.rng.choice(("inject_failure", "clear_failure", "stress"))
+        params = {"load": self.rng.choice(LOADS)}
+        if action != "stress":
+            params["type"] = self.rng.choice(INJECTION_TYPES)
+        return {"action": action, "params": params, "duration": self.rng.randint(1, MAX_DURATION)}
+
+    def _random_steps(self):
+        return [self._random_step() for _ in range(self.rng.randint(1, self.max_steps))]
+
+    def _mutate(self, steps):
+        steps = copy.deepcopy(steps)
+        for _ in range(self.rng.randint(1, 3)):
+            op = self.rng.randrange(5)
+            if op == 0 and len(steps) < self.max_steps:
+                steps.insert(self.rng.randint(0, len(steps)), self._random_step())
+            elif op == 1 and len(steps) > 1:
+                del steps[self.rng.randrange(len(steps))]
+            elif op == 2:
+                step = self.rng.choice(steps)
+                field = self.rng.choice(("duration", "load", "type"))
+                if field == "duration":
+                    step['duration'] = self.rng.randint(1, MAX_DURATION)
+                elif field == "load":
+                    step['params']['load'] = self.rng.choice(LOADS)
+                elif 'type' in step['params']:
+                    step['params']['type'] = self.rng.choice(INJECTION_TYPES)
+            elif op == 3 and len(steps) > 1:
+                idx = self.rng.randrange(len(steps) - 1)
+                steps[idx], steps[idx + 1] = steps[idx + 1], steps[idx]
+            elif op == 4 and self.corpus:
+                other = self.rng.choice(self.corpus)
+                cut = self.rng.randint(0, len(steps))
+                steps = (steps[:cut] + copy.deepcopy(other[self.rng.randint(0, len(other)):]))[:self.max_steps] or steps
+        return steps
+
+    @staticmethod
+    def _sequence_key(steps):
+        return tuple((step['action'], step['params'].get('type'), step['params']['load'], step['duration'])
+                     for step in steps)
+
+def write_reproducers(plans, output_dir, target):
+    os.makedirs(output_dir, exist_ok=True)
+    paths = []
+    for plan in plans:
+        digest = hashlib.sha1(json.dumps(plan, sort_keys=True).encode("utf-8")).hexdigest()[:8]
+        path = os.path.join(output_dir, f"fuzz_{target}_{digest}.yaml")
+        with open(path, 'w') as f:
+            yaml.safe_dump(plan, f, sort_keys=False)
+        paths.append(path)
+    return paths
@@ -0,0 +1,125 @@
+import logging
+import queue
+import threading
+import time
+from .runner import TestRunner
+from .rca import RootCauseAnalyzer
+from .report import ReportGenerator
+from .baseline import load_baseline
+
+logger = logging.getLogger("ForgeLab")
+
+_DONE = object()
+
+class RunPipeline:
+    """
+    Runs a batch of plans as three overlapping stages (simulate -> analyze ->
+    report), each on its own thread and joined by bounded queues. The
+    simulator moves on to the next plan while earlier runs are still being
+    analyzed and written, so batch wall time tends towards the slowest stage.
+    """
+    STAGES = ("simulate", "analyze", "report")
+
+    def __init__(self, runs, correlate=False, realtime=True, output_dir="reports", queue_size=2,
+                 baseline=False, profile=False, seed=None):
+        self.runs = runs # [(run_id, plan_path), ...]
+        self.correlate = correlate
+        self.baseline = baseline
+        self.profile = profile
+        self.seed = seed
+        self.realtime = realtime
+        self.output_dir = output_dir
+        self.queues = [queue.Queue(maxsize=queue_size) for _ in self.STAGES[1:]]
+        self.results = []
+
+    def run(self):
+        start = time.time()
+        threads = [
+            threading.Thread(target=self._simulate, name="pipeline-simulate"),
+            threading.Thread(target=self._analyze, name="pipeline-analyze"),
+            threading.Thread(target=self._report, name="pipeline-report"),
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        wall = time.time() - start
+        busy = {stage: sum(r['timings'].get(stage, 0.0) for r in self.results) for stage in self.STAGES}
+        logger.info(f"Pipeline finished {len(self.results)} run(s) in {wall:.2f}s "
+                    f"(stage busy: " + ", ".join(f"{k}={v:.2f}s" for k, v in busy.items()) + ")")
+        return self.results
+
+    def _simulate(self):
+        try:
+            for run_id, plan_path in self.runs:
+                item = {"run_id": run_id, "plan": plan_path, "error": None, "timings": {}}
+                started = time.perf_counter()
+                try:
+                    runner = TestRunner(plan_path, realtime=self.realtime, seed=self.seed)
+                    item["test_plan"] = runner.test_plan
+                    item["seed"] = runner.seed
+                    item["telemetry"], item["failed_steps"] = runner.execute()
+                    item["step_costs"] = runner.step_costs
+                except Exception as e:
+                    logger.exception(f"Fatal error during execution of {plan_path}")
+                    item["error"] = f"{type(e).__name__}: {e}"
+                item["timings"]["simulate"] = time.perf_counter() - started
+                self.queues[0].put(item)
+        finally:
+            self.queues[0].put(_DONE)
+
+    def _analyze(self):
+        try:
+            while (item := self.queues[0].get()) is not _DONE:
+                if item["error"] is None:
+                    started = time.perf_counter()
+                    logger.info(f"Running Root Cause Analysis... ({item['run_id']})")
+                    try:
+                        rca = RootCauseAnalyzer(item["telemetry"], correlate=self.correlate)
+                        item["findings"] = rca.analyze()
+                        if self.baseline:
+                            self._compare_baseline(item)
+                    except Exception as e:
+                        logger.exception(f"RCA failed for {item['run_id']}")
+                        item["error"] = f"{type(e).__name__}: {e}"
+                    item["timings"]["analyze"] = time.perf_counter() - started
+                self.queues[1].put(item)
+        finally:
+            self.queues[1].put(_DONE)
+
+    def _compare_baseline(self, item):
+        golden = load_baseline(item["plan"])
+        if golden is None:
+            logger.warning(f"No golden baseline recorded for {item['plan']}")
+            return
+        regressed, findings = golden.compare(item["telemetry"])
+        item["findings"] = item["findings"] + findings
+        for step in regressed:
+            if step not in item["failed_steps"]:
+                logger.error(f"Step Failed: {step} (baseline regression)")
+                item["failed_steps"].append(step)
+
+    def _profile_data(self, item):
+        if not self.profile:
+            return None
+        return {"phases": dict(item["timings"]), "steps": item.get("step_costs", [])}
+
+    def _report(self):
+        while (item := self.queues[1].get()) is not _DONE:
+            if item["error"] is None:
+                started = time.perf_counter()
+                logger.info(f"Generating Reports... ({item['run_id']})")
+                try:
+                    reporter = ReportGenerator(item["run_id"], item["telemetry"], item["findings"],
+                                               item["failed_steps"], output_dir=self.output_dir,
+                                               test_plan=item["test_plan"], plan_path=item["plan"],
+                                               profile=self._profile_data(item), seed=item["seed"])
+                    reporter.generate()
+                except Exception as e:
+                    logger.exception(f"Report generation failed for {item['run_id']}")
+                    item["error"] = f"{type(e).__name__}: {e}"
+                item["timings"]["report"] = time.perf_counter() - started
+            # Drop the raw samples once written; only the summary is kept
+            item.pop("telemetry", None)
+            self.results.append(item)
@@ -0,0 +1,104 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+# Phases reported in the cost table: label -> predicate on a frame label
+PHASES = {
+    "TestRunner.execute": lambda label: label.startswith("TestRunner.execute "),
+    "VirtualHardware.update": lambda label: label.startswith("VirtualHardware.update "),
+    "RootCauseAnalyzer.analyze": lambda label: label.startswith("RootCauseAnalyzer.analyze "),
+    "ReportGenerator.generate": lambda label: label.startswith("ReportGenerator.generate "),
+    "logging": lambda label: "(logging" in label,
+}
+
+# Leaf frames of threads parked on a lock/queue; not counted as work
+_IDLE_FILES = ("threading.py", "queue.py")
+
+class SamplingProfiler:
+    """
+    Wall-clock sampling profiler. A daemon thread snapshots every other
+    thread's Python stack each `interval` seconds and counts collapsed
+    stacks, so overhead scales with the sample rate rather than call count.
+    The sampler often wakes late (it needs the GIL), so each stack is also
+    weighted by the measured time since the previous pass.
+    """
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.stacks = Counter()
+        self.seconds = Counter() # stack -> measured seconds attributed to it
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+        self._labels = {}
+
+    def start(self):
+        self._thread = threading.Thread(target=self._sample, name="profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def _label(self, code):
+        label = self._labels.get(code)
+        if label is None:
+            name = getattr(code, "co_qualname", code.co_name)
+            parent = os.path.basename(os.path.dirname(code.co_filename))
+            label = f"{name} ({parent}/{os.path.basename(code.co_filename)})"
+            self._labels[code] = label
+        return label
+
+    def _sample(self):
+        own = threading.get_ident()
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            elapsed, last = now - last, now
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                if os.path.basename(frame.f_code.co_filename) in _IDLE_FILES:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(self._label(frame.f_code))
+                    frame = frame.f_back
+                key = ";".join(reversed(stack))
+                self.stacks[key] += 1
+                self.seconds[key] += elapsed
+                self.samples += 1
+
+    def write_collapsed(self, path):
+        """
+        Writes `stack count` lines, the input format of flamegraph.pl / speedscope.
+        """
+        with open(path, 'w') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+    def phase_breakdown(self):
+        """
+        Inclusive cost per phase: {phase: (samples, seconds, percent)}, with
+        seconds and percent from the measured time between sampling passes.
+        """
+        counts, seconds = Counter(), Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(";")
+            for phase, match in PHASES.items():
+                if any(match(frame) for frame in frames):
+                    counts[phase] += count
+                    seconds[phase] += self.seconds[stack]
+        total = sum(self.seconds.values()) or 1.0
+        return {phase: (counts[phase], seconds[phase], 100.0 * seconds[phase] / total)
+                for phase in PHASES}
+
+def phase_table(breakdown, samples):
+    lines = ["| Phase | Samples | Time (s) | Share |", "|---|---|---|---|"]
+    for phase, (count, seconds, percent) in breakdown.items():
+        lines.append(f"| {phase} | {count} | {seconds:.3f} | {percent:.1f}% |")
+    lines.append(f"\nTotal samples: {samples}")
+    return lines
@@ -1,22 +1,39 @@
+import numpy as np
+from .failures import INJECTION_TYPES, INJECTION_BITS
+
 class RootCauseAnalyzer:
     """
     Analyzes telemetry history to determine root cause of failures.
     """
-    def __init__(self, telemetry_data):
+    # Thresholds
+    TEMP_CRITICAL = 95.0
+    VOLTAGE_LOW = 11.4
+    FAN_STALL_RPM = 100
+
+    # Signals ranked against each other in correlation mode
+    CORRELATION_SIGNALS = ["fan_rpm", "psu_voltage_v", "active_load", "injections", "cpu_temp_c"]
+
+    # Plausible causes per excursion and the sign of r a causal link implies.
+    # Only faults that physically drive the signal are listed; e.g. fan RPM
+    # tracking temperature upwards is the fan responding, not a cause
+    CAUSE_SIGNS = {
+        "cpu_temp_c": {"injections:fan_stall": 1, "injections:overheat": 1, "active_load": 1, "fan_rpm": -1},
+        "psu_voltage_v": {"injections:psu_sag": -1, "active_load": -1},
+    }
+
+    def __init__(self, telemetry_data, correlate=False, max_lag=60, top_causes=3):
         self.data = telemetry_data
+        self.correlate = correlate
+        self.max_lag = max_lag
+        self.top_causes = top_causes
 
     def analyze(self):
         findings = []
-        
-        # Thresholds
-        TEMP_CRITICAL = 95.0
-        VOLTAGE_LOW = 11.4
-        FAN_STALL_RPM = 100
 
         for idx, entry in enumerate(self.data):
             # Thermal Analysis
-            if entry['cpu_temp_c'] > TEMP_CRITICAL:
-                if entry['fan_rpm'] < FAN_STALL_RPM:
+            if entry['cpu_temp_c'] > self.TEMP_CRITICAL:
+                if entry['fan_rpm'] < self.FAN_STALL_RPM:
                     findings.append(f"T={idx}s: Thermal Excursion caused by Fan Stall (RPM={entry['fan_rpm']})")
                 elif entry['active_load'] > 90:
                     findings.append(f"T={idx}s: Thermal Saturation under High Load ({entry['active_load']}%)")
@@ -24,7 +41,7 @@ class RootCauseAnalyzer:
                     findings.append(f"T={idx}s: Unexplained Thermal Spikes")
 
             # Power Analysis
-            if entry['psu_voltage_v'] < VOLTAGE_LOW:
+            if entry['psu_voltage_v'] < self.VOLTAGE_LOW:
                 findings.append(f"T={idx}s: PSU Voltage Sag detected ({entry['psu_voltage_v']}V)")
 
             # Throttling
@@ -33,4 +50,115 @@ class RootCauseAnalyzer:
 
         # Deduplicate and summarize
         unique_findings = sorted(list(set(findings)))
+        if self.correlate:
+            unique_findings += self.rank_causes()
         return unique_findings if unique_findings else ["No Anomalies Detected"]
+
+    def rank_causes(self):
+        """
+        Ranks which signals led each excursion (CPU over-temp, PSU sag) using
+        the lagged cross-correlations, strongest first.
+        """
+        if not self.data:
+            return []
+        targets = []
+        if any(d['cpu_temp_c'] > self.TEMP_CRITICAL or d['cpu_throttle'] for d in self.data):
+            targets.append("cpu_temp_c")
+        if any(d['psu_voltage_v'] < self.VOLTAGE_LOW for d in self.data):
+            targets.append("psu_voltage_v")
+
+        lags, windows = self.lagged_correlations()
+        leading = lags >= 0
+        findings = []
+        for target in targets:
+            candidates = []
+            for cause, sign in self.CAUSE_SIGNS[target].items():
+                # Orient as (cause, target) so a positive lag means the cause leads
+                if (cause, target) in windows:
+                    corr = windows[(cause, target)]
+                elif (target, cause) in windows:
+                    corr = windows[(target, cause)][::-1]
+                else:
+                    continue
+                # Strongest correlation in the causal direction at a non-negative lag
+                score = np.where(leading, sign * corr, -np.inf)
+                best = int(score.argmax())
+                if score[best] > 0:
+                    candidates.append((abs(corr[best]), cause, int(lags[best]), float(corr[best])))
+            candidates.sort(reverse=True)
+            for rank, (_, cause, lag, r) in enumerate(candidates[:self.top_causes], start=1):
+                timing = f"leads by {lag}s" if lag > 0 else "coincident"
+                findings.append(f"Likely cause #{rank} of {target} excursion: {cause} "
+                                f"{timing} (r={r:+.2f})")
+        return findings
+
+    def cross_correlate(self):
+        """
+        Peak of each pair's lagged cross-correlation: {(a, b): (lag, r)} at
+        the lag with the largest |r|; a positive lag means `a` leads `b`.
+        """
+        lags, windows = self.lagged_correlations()
+        results = {}
+        for pair, corr in windows.items():
+            best = int(np.abs(corr).argmax())
+            results[pair] = (int(lags[best]), float(corr[best]))
+        return results
+
+    def lagged_correlations(self):
+        """
+        Lagged Pearson cross-correlation for every signal pair via FFT,
+        O(n log n) per pair. Returns (lags, {(a, b): r per lag}) with lags
+        ascending over +/- max_lag; r at lag k pairs a[t] with b[t + k].
+        The lag window is capped at a quarter of the run so the estimate
+        always rests on most of the samples.
+        """
+        names, matrix = self._signal_matrix()
+        n = matrix.shape[1] if len(names) else 0
+        if n < 2:
+            return np.array([], dtype=np.int64), {}
+
+        max_lag = min(self.max_lag, max(1, n // 4))
+        nfft = 1 << (2 * n - 1).bit_length()
+        spectra = np.fft.rfft(matrix, nfft, axis=1)
+        lags = np.arange(-max_lag, max_lag + 1)
+
+        windows = {}
+        for i in range(len(names)):
+            for j in range(i + 1, len(names)):
+                # corr[k] = sum_t a[t] * b[t + k] / n
+                corr = np.fft.irfft(spectra[j] * np.conj(spectra[i]), nfft) / n
+                windows[(names[i], names[j])] = np.concatenate([corr[nfft - max_lag:], corr[:max_lag + 1]])
+        return lags, windows
+
+    def _signal_matrix(self):
+        columns = {}
+        for signal in self.CORRELATION_SIGNALS:
+            if signal == "injections":
+                columns.update(self._injection_columns())
+            elif self.data and signal in self.data[0]:
+                columns[signal] = np.fromiter((d[signal] for d in self.data), dtype=np.float64, count=len(self.data))
+
+        names, rows = [], []
+        for name, values in columns.items():
+            std = values.std()
+            if std == 0:
+                continue # constant signals carry no timing information
+            names.append(name)
+            rows.append((values - values.mean()) / std)
+        return names, np.array(rows).reshape(len(rows), len(self.data))
+
+    def _injection_columns(self):
+        # One 0/1 series per injection type, e.g. "injections:fan_stall"
+        columns = {}
+        if self.data and 'injection_mask' in self.data[0]:
+            masks = np.fromiter((d['injection_mask'] for d in self.data), dtype=np.int64, count=len(self.data))
+            for injection in INJECTION_TYPES:
+                columns[f"injections:{injection}"] = ((masks & INJECTION_BITS[injection]) != 0).astype(np.float64)
+            return columns
+
+        # Older telemetry only carries the stringified list
+        labels = [str(d.get('injections', "")) for d in self.data]
+        for injection in INJECTION_TYPES:
+            values = np.fromiter((injection in label for label in labels), dtype=np.float64, count=len(labels))
+            columns[f"injections:{injection}"] = values
+        return columns
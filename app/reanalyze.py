@@ -0,0 +1,130 @@
+import csv
+import glob
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import yaml
+
+from .baseline import load_baseline
+from .rca import RootCauseAnalyzer
+from .report import load_run_index, write_run_index
+from .runner import check_criteria
+from .sensors import VirtualHardware
+
+logger = logging.getLogger("ForgeLab")
+
+def _coerce(value):
+    # CSV round-trip: restore the bool/int/float types the runner wrote
+    if value == "True":
+        return True
+    if value == "False":
+        return False
+    try:
+        return int(value)
+    except ValueError:
+        pass
+    try:
+        return float(value)
+    except ValueError:
+        return value
+
+def load_metrics(path):
+    """
+    Streams a `*_metrics.csv` archive back into telemetry dicts.
+    """
+    with open(path, 'r', newline='') as f:
+        return [{key: _coerce(value) for key, value in row.items()} for row in csv.DictReader(f)]
+
+def _load_criteria(entry):
+    # Prefer the current plan file so edited criteria apply; fall back to the
+    # criteria recorded when the run was archived
+    archived = entry.get('criteria')
+    plan_path = entry.get('plan_path')
+    if not plan_path or not os.path.exists(plan_path):
+        return archived
+    with open(plan_path, 'r') as f:
+        plan = yaml.safe_load(f) or {}
+    current = [{"name": step.get('name'), "criteria": step.get('criteria', {})} for step in plan.get('steps', [])]
+    if archived is None or [s['name'] for s in current] == [s['name'] for s in archived]:
+        return current
+
+    # Telemetry is indexed by the steps as they were at run time, so keep
+    # that order and take current criteria only for steps matched by name
+    logger.warning(f"Steps of {plan_path} changed since {entry.get('run_id')}; matching criteria by step name")
+    by_name = {step['name']: step['criteria'] for step in current}
+    return [{"name": step['name'], "criteria": by_name.get(step['name'], step['criteria'])} for step in archived]
+
+def rescore_criteria(telemetry, steps):
+    """
+    Re-evaluates each step's criteria against the last sample recorded for
+    that step (or the most recent earlier sample for steps with no ticks).
+    """
+    last_by_step = {}
+    for sample in telemetry:
+        last_by_step[sample['step']] = sample
+
+    failed_steps = []
+    latest = VirtualHardware().get_telemetry()
+    for idx, step in enumerate(steps):
+        latest = last_by_step.get(idx, latest)
+        if step.get('criteria') and check_criteria(step['criteria'], latest):
+            failed_steps.append(step.get('name'))
+    return failed_steps
+
+def reanalyze_run(metrics_path, entry, correlate=False, baseline=False):
+    """
+    Re-runs step criteria and RCA for one archived run and returns the
+    updated index entry.
+    """
+    telemetry = load_metrics(metrics_path)
+    entry = dict(entry)
+    entry['metrics'] = os.path.basename(metrics_path)
+
+    steps = _load_criteria(entry)
+    if telemetry and steps is not None and 'step' in telemetry[0]:
+        entry['failed_steps'] = rescore_criteria(telemetry, steps)
+        entry['status'] = "FAIL" if entry['failed_steps'] else "PASS"
+    if telemetry:
+        entry['findings'] = RootCauseAnalyzer(telemetry, correlate=correlate).analyze()
+
+    golden = load_baseline(entry['plan_path']) if baseline and entry.get('plan_path') else None
+    if golden is not None and telemetry and 'step' in telemetry[0]:
+        regressed, findings = golden.compare(telemetry)
+        entry['findings'] = entry['findings'] + findings
+        entry['failed_steps'] = list(dict.fromkeys(entry.get('failed_steps', []) + regressed))
+        entry['status'] = "FAIL" if entry['failed_steps'] else "PASS"
+    entry['reanalyzed'] = datetime.now().isoformat(timespec="seconds")
+    return entry
+
+def _reanalyze_task(args):
+    return reanalyze_run(*args)
+
+def reanalyze_archive(output_dir="reports", run_ids=None, correlate=False, jobs=None, baseline=False):
+    """
+    Re-scores every archived run in `output_dir` across a process pool and
+    writes the updated entries back to the run index.
+    """
+    index = load_run_index(output_dir)
+    tasks = []
+    for path in sorted(glob.glob(os.path.join(output_dir, "*_metrics.csv"))):
+        run_id = os.path.basename(path)[:-len("_metrics.csv")]
+        if run_ids and run_id not in run_ids:
+            continue
+        tasks.append((path, index.get(run_id, {"run_id": run_id}), correlate, baseline))
+
+    start = time.time()
+    changed = 0
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        chunksize = max(1, len(tasks) // ((jobs or os.cpu_count() or 1) * 4))
+        for entry in pool.map(_reanalyze_task, tasks, chunksize=chunksize):
+            previous = index.get(entry['run_id'], {})
+            if any(previous.get(key) != entry.get(key) for key in ('status', 'failed_steps', 'findings')):
+                changed += 1
+            index[entry['run_id']] = entry
+
+    write_run_index(index, output_dir)
+    logger.info(f"Re-analyzed {len(tasks)} run(s) in {time.time() - start:.2f}s; {changed} changed")
+    return [index[os.path.basename(task[0])[:-len("_metrics.csv")]] for task in tasks]
@@ -1,19 +1,63 @@
 import csv
+import json
 import os
 from datetime import datetime
+from .downsample import TelemetryPyramid
+
+INDEX_FILE = "index.jsonl"
+
+def load_run_index(output_dir="reports"):
+    """
+    Returns {run_id: entry} from the run index; later lines win.
+    """
+    path = os.path.join(output_dir, INDEX_FILE)
+    index = {}
+    if not os.path.exists(path):
+        return index
+    with open(path, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                entry = json.loads(line)
+                index[entry['run_id']] = entry
+    return index
+
+def write_run_index(index, output_dir="reports"):
+    # Rewrite via a temp file so readers never see a half-written index
+    path = os.path.join(output_dir, INDEX_FILE)
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w') as f:
+        for entry in index.values():
+            f.write(json.dumps(entry) + "\n")
+    os.replace(tmp, path)
+
+def append_report_section(run_id, title, lines, output_dir="reports"):
+    # For data only known after generate(), e.g. whole-process profiles
+    filename = os.path.join(output_dir, f"{run_id}_summary.md")
+    with open(filename, 'a') as f:
+        f.write(f"\n{title}\n")
+        for line in lines:
+            f.write(f"{line}\n")
 
 class ReportGenerator:
-    def __init__(self, run_id, telemetry, findings, failed_steps, output_dir="reports"):
+    def __init__(self, run_id, telemetry, findings, failed_steps, output_dir="reports",
+                 test_plan=None, plan_path=None, profile=None, seed=None):
         self.run_id = run_id
         self.telemetry = telemetry
         self.findings = findings
         self.failed_steps = failed_steps
         self.output_dir = output_dir
+        self.test_plan = test_plan or {}
+        self.plan_path = plan_path
+        self.profile = profile
+        self.seed = seed
         os.makedirs(output_dir, exist_ok=True)
 
     def generate(self):
         self._write_csv()
+        self._write_pyramid()
         self._write_markdown()
+        self._append_index()
 
     def _write_csv(self):
         filename = os.path.join(self.output_dir, f"{self.run_id}_metrics.csv")
@@ -27,6 +71,31 @@ class ReportGenerator:
             writer.writerows(self.telemetry)
         print(f"CSV Report generated: {filename}")
 
+    def _write_pyramid(self):
+        # Precomputed min/max/mean levels so dashboards never scan raw samples
+        if not self.telemetry:
+            return
+        filename = os.path.join(self.output_dir, f"{self.run_id}_pyramid.npz")
+        TelemetryPyramid.build(self.telemetry).save(filename)
+
+    def _append_index(self):
+        # One line per run; appends from concurrent writers stay line-atomic
+        entry = {
+            "run_id": self.run_id,
+            "plan_path": self.plan_path,
+            "plan_name": self.test_plan.get('name'),
+            "seed": self.seed,
+            "criteria": [{"name": step.get('name'), "criteria": step.get('criteria', {})}
+                         for step in self.test_plan.get('steps', [])],
+            "status": "FAIL" if self.failed_steps else "PASS",
+            "failed_steps": self.failed_steps,
+            "findings": self.findings,
+            "metrics": f"{self.run_id}_metrics.csv",
+            "updated": datetime.now().isoformat(timespec="seconds"),
+        }
+        with open(os.path.join(self.output_dir, INDEX_FILE), 'a') as f:
+            f.write(json.dumps(entry) + "\n")
+
     def _write_markdown(self):
         filename = os.path.join(self.output_dir, f"{self.run_id}_summary.md")
         status = "FAIL" if self.failed_steps else "PASS"
@@ -55,4 +124,16 @@ class ReportGenerator:
             f.write(f"- **Max CPU Temp:** {max_temp} C\n")
             f.write(f"- **Max Power Draw:** {max_power} W\n")
 
+            if self.profile:
+                f.write("\n## 4. Performance Profile\n")
+                f.write("| Phase | Wall Time (s) |\n|---|---|\n")
+                for phase, seconds in self.profile.get('phases', {}).items():
+                    f.write(f"| {phase} | {seconds:.4f} |\n")
+
+                f.write("\n| Step | Action | Ticks | Wall Time (s) | ms/tick |\n|---|---|---|---|---|\n")
+                for step in self.profile.get('steps', []):
+                    per_tick = 1000.0 * step['seconds'] / step['ticks'] if step['ticks'] else 0.0
+                    f.write(f"| {step['name']} | {step['action']} | {step['ticks']} | "
+                            f"{step['seconds']:.4f} | {per_tick:.3f} |\n")
+
         print(f"Markdown Report generated: {filename}")
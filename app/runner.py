@@ -2,30 +2,56 @@ import time
 import yaml
 import logging
 from .sensors import VirtualHardware
-from .failures import FailureInjector
+from .failures import InjectionSchedule
 
 logger = logging.getLogger("ForgeLab")
 
+BOOT_STAGES = ["POST", "UEFI", "GRUB", "KERNEL", "OS"]
+LOOP_ACTIONS = ("stress", "inject_failure", "clear_failure")
+
 class TestRunner:
-    def __init__(self, plan_path):
+    def __init__(self, plan_path, test_plan=None, realtime=True, seed=None):
         self.plan_path = plan_path
         self.hardware = VirtualHardware()
-        self.injector = FailureInjector()
+        self.schedule = None
+        self.tick = 0
+        self.step_index = 0
+        self.step_costs = []
+        self.paced_seconds = 0.0 # time spent in the realtime pacing sleep
         self.telemetry_history = []
-        self.test_plan = self._load_plan()
+        self.test_plan = test_plan if test_plan is not None else self._load_plan()
         self.failed_steps = []
+        self.realtime = realtime # False skips the per-tick sleep (batch/distributed runs)
+        # Stochastic fault schedules are seeded so every run is reproducible
+        self.seed = seed if seed is not None else self.test_plan.get('seed', 0)
 
     def _load_plan(self):
         with open(self.plan_path, 'r') as f:
             return yaml.safe_load(f)
 
-    def execute(self):
+    def execute(self, on_step=None):
+        """
+        Runs the plan. `on_step(step_index)` is called after each step;
+        returning True stops the run early (search tools use it to skip
+        states they have already explored).
+        """
         logger.info(f"Starting Test Plan: {self.test_plan.get('name', 'Unknown')}")
         steps = self.test_plan.get('steps', [])
-        
+
+        # Injection state for every tick is fixed before the run starts
+        self.schedule = InjectionSchedule.compile(
+            steps,
+            [self._step_ticks(step) for step in steps],
+            self.test_plan.get('faults', []),
+            seed=self.seed,
+        )
+        self.tick = 0
+
         start_time = time.time()
         
-        for step in steps:
+        for step_index, step in enumerate(steps):
+            self.step_index = step_index
+            step_started, step_tick, step_paced = time.perf_counter(), self.tick, self.paced_seconds
             step_name = step.get('name')
             duration = step.get('duration', 1)
             action = step.get('action')
@@ -38,11 +64,8 @@ class TestRunner:
                 self._simulate_boot(duration)
             elif action == 'stress':
                 self._run_loop(duration, load=params.get('load', 50))
-            elif action == 'inject_failure':
-                self.injector.set_injection(params.get('type'), True)
-                self._run_loop(duration, load=params.get('load', 10))
-            elif action == 'clear_failure':
-                self.injector.set_injection(params.get('type'), False)
+            elif action in ('inject_failure', 'clear_failure'):
+                # Fault timing comes from the compiled schedule
                 self._run_loop(duration, load=params.get('load', 10))
             
             # Validate Step Criteria
@@ -52,45 +75,78 @@ class TestRunner:
             else:
                 logger.info(f"Step Passed: {step_name}")
 
+            self.step_costs.append({
+                "name": step_name,
+                "action": action,
+                "ticks": self.tick - step_tick,
+                # Pacing sleep is not simulation cost
+                "seconds": time.perf_counter() - step_started - (self.paced_seconds - step_paced),
+            })
+            if on_step and on_step(step_index):
+                break
+
         total_time = time.time() - start_time
         logger.info(f"Test Plan Completed in {total_time:.2f}s")
         return self.telemetry_history, self.failed_steps
 
+    @staticmethod
+    def _step_ticks(step):
+        # Must mirror how execute() spends ticks on each action
+        duration = step.get('duration', 1)
+        if step.get('action') == 'boot':
+            return int(duration / len(BOOT_STAGES)) * len(BOOT_STAGES)
+        if step.get('action') in LOOP_ACTIONS:
+            return int(duration)
+        return 0
+
     def _simulate_boot(self, duration):
-        stages = ["POST", "UEFI", "GRUB", "KERNEL", "OS"]
-        stage_duration = duration / len(stages)
-        for stage in stages:
+        stage_duration = duration / len(BOOT_STAGES)
+        for stage in BOOT_STAGES:
             self.hardware.boot_stage = stage
             self._run_loop(stage_duration, load=20)
 
     def _run_loop(self, duration, load):
         # Simulation runs at 10x speed (0.1s sleep = 1s sim time)
         ticks = int(duration)
+        schedule = self.schedule
         for _ in range(ticks):
-            self.hardware.update(load, self.injector.get_active())
+            mask = schedule.masks[self.tick]
+            self.hardware.update(load, schedule.active(self.tick))
             data = self.hardware.get_telemetry()
             data['timestamp'] = time.time()
             data['active_load'] = load
-            data['injections'] = str([k for k,v in self.injector.get_active().items() if v])
+            data['injections'] = schedule.label(mask)
+            data['injection_mask'] = mask
+            data['step'] = self.step_index
             self.telemetry_history.append(data)
-            time.sleep(0.05) # Speed up simulation for CLI UX
+            self.tick += 1
+            if self.realtime:
+                paced = time.perf_counter()
+                time.sleep(0.05) # Speed up simulation for CLI UX
+                self.paced_seconds += time.perf_counter() - paced
 
     def _validate_criteria(self, criteria):
         if not criteria:
             return True
-        
-        latest = self.hardware.get_telemetry()
-        
-        if 'max_temp' in criteria and latest['cpu_temp_c'] > criteria['max_temp']:
-            logger.warning(f"Validation Fail: Temp {latest['cpu_temp_c']} > {criteria['max_temp']}")
-            return False
-            
-        if 'min_voltage' in criteria and latest['psu_voltage_v'] < criteria['min_voltage']:
-            logger.warning(f"Validation Fail: Voltage {latest['psu_voltage_v']} < {criteria['min_voltage']}")
-            return False
 
-        if 'os_running' in criteria and criteria['os_running'] and latest['os_health'] != "OK":
-            logger.warning("Validation Fail: OS Health not OK")
+        reason = check_criteria(criteria, self.hardware.get_telemetry())
+        if reason:
+            logger.warning(f"Validation Fail: {reason}")
             return False
-            
         return True
+
+def check_criteria(criteria, latest):
+    """
+    Evaluates step criteria against the telemetry sample at the end of the
+    step. Returns the first failure reason, or None if all criteria hold.
+    """
+    if 'max_temp' in criteria and latest['cpu_temp_c'] > criteria['max_temp']:
+        return f"Temp {latest['cpu_temp_c']} > {criteria['max_temp']}"
+
+    if 'min_voltage' in criteria and latest['psu_voltage_v'] < criteria['min_voltage']:
+        return f"Voltage {latest['psu_voltage_v']} < {criteria['min_voltage']}"
+
+    if 'os_running' in criteria and criteria['os_running'] and latest['os_health'] != "OK":
+        return "OS Health not OK"
+
+    return None
@@ -27,10 +27,10 @@ class VirtualHardware:
         """
         Ticks the simulation physics forward by one step.
         """
-        # 1. Apply Failures/Injections
-        fan_stall = injection_map.get('fan_stall', False)
-        psu_sag = injection_map.get('psu_sag', False)
-        overheat_inject = injection_map.get('overheat', False)
+        # 1. Apply Failures/Injections (0..1 severity; True is full strength)
+        fan_stall = float(injection_map.get('fan_stall', 0.0))
+        psu_sag = float(injection_map.get('psu_sag', 0.0))
+        overheat_inject = float(injection_map.get('overheat', 0.0))
         fw_hang = injection_map.get('fw_hang', False)
 
         # 2. Calculate Power (Load dependent)
@@ -39,22 +39,19 @@ class VirtualHardware:
         self.psu_power_w = base_power + load_power
         
         # 3. Calculate Voltage (Sag simulation)
-        target_voltage = 11.0 if psu_sag else 12.0
+        target_voltage = 12.0 - (1.0 * psu_sag)
         # Smooth transition
         self.psu_voltage_v = (self.psu_voltage_v * 0.8) + (target_voltage * 0.2)
         self.psu_current_a = self.psu_power_w / self.psu_voltage_v
 
         # 4. Fan Control (PID-ish)
-        target_rpm = 2000 + (load_percent * 50)
-        if fan_stall:
-            target_rpm = 0
+        target_rpm = (2000 + (load_percent * 50)) * (1.0 - fan_stall)
         self.fan_rpm = int((self.fan_rpm * 0.9) + (target_rpm * 0.1))
 
         # 5. Thermal Physics
         # Heat generation
         heat_gen = (self.psu_power_w * 0.4) 
-        if overheat_inject:
-            heat_gen += 100.0
+        heat_gen += 100.0 * overheat_inject
             
         # Cooling (RPM dependent)
         cooling = (self.fan_rpm / 8000.0) * (self.cpu_temp_c - 25.0) * 2.0
@@ -76,6 +73,20 @@ class VirtualHardware:
         elif self.boot_stage == "OS":
             self.os_health = "CRITICAL" if self.cpu_temp_c > 105.0 else "OK"
 
+    def state_key(self):
+        """
+        Hashable, quantized snapshot of the simulated state. Runs that land in
+        the same key behave the same from here on, so search tools can dedupe.
+        """
+        return (
+            round(self.cpu_temp_c),
+            self.fan_rpm // 100,
+            round(self.psu_voltage_v, 1),
+            self.cpu_throttle,
+            self.boot_stage,
+            self.os_health,
+        )
+
     def get_telemetry(self):
         return {
             "cpu_temp_c": round(self.cpu_temp_c, 2),
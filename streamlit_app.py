@@ -10,6 +10,8 @@ from statistics import mean
 
 import streamlit as st
 
+from app.downsample import TelemetryPyramid
+
 APP_TITLE = "ForgeLab-RTP"
 APP_SUBTITLE = "System-Level Server Bring-Up, Thermal & Power Validation Platform"
 
@@ -193,6 +195,17 @@ def extract_signal_series(samples, possible_keys):
             series.append(float(val))
     return series
 
+@st.cache_resource(max_entries=4)
+def load_pyramid(path, mtime):
+    # mtime is part of the cache key so a rewritten run is reloaded
+    return TelemetryPyramid.load(path)
+
+def latest_pyramid():
+    paths = sorted(glob.glob("reports/*_pyramid.npz"), key=os.path.getmtime, reverse=True)
+    if not paths:
+        return None, None
+    return paths[0], load_pyramid(paths[0], os.path.getmtime(paths[0]))
+
 def infer_failure_modes(obj, samples):
     failures = pick_first_key(obj, ["failures", "failure_modes", "faults", "alerts"])
     if isinstance(failures, list) and failures:
@@ -446,7 +459,46 @@ else:
     st.markdown("<div class='card muted'>No procedural steps found in latest log (expected keys: events/procedure/steps/timeline).</div>", unsafe_allow_html=True)
 
 st.markdown("## Top Signals (Telemetry Summary)")
-if samples:
+SIGNAL_LABELS = {
+    "cpu_temp_c": "CPU Temp (C)",
+    "psu_voltage_v": "PSU Voltage (V)",
+    "fan_rpm": "Fan RPM",
+}
+CHART_POINTS = 800
+pyramid_path, pyramid = latest_pyramid()
+if pyramid is not None and pyramid.length:
+    # Precomputed levels: stats and charts cost O(points shown), not O(samples)
+    rows = []
+    for key, label in SIGNAL_LABELS.items():
+        stats = pyramid.summary(key)
+        if stats:
+            rows.append(
+                {
+                    "Signal": label,
+                    "Min": round(stats["min"], 3),
+                    "Avg": round(stats["avg"], 3),
+                    "Max": round(stats["max"], 3),
+                    "Trend": stats["trend"],
+                    "Samples": stats["samples"],
+                }
+            )
+    st.write(pathlib.Path(pyramid_path).name)
+    st.dataframe(rows, use_container_width=True, hide_index=True)
+    st.caption("Trend: ↗ increasing, ↘ decreasing, → stable")
+
+    chart_signal = st.selectbox("Chart signal", pyramid.signals(), format_func=lambda k: SIGNAL_LABELS.get(k, k))
+    if pyramid.length > 1:
+        t0, t1 = st.slider("Tick range", 0, pyramid.length, (0, pyramid.length))
+    else:
+        t0, t1 = 0, pyramid.length
+    view = pyramid.query(chart_signal, t0, t1, max_points=CHART_POINTS)
+    st.line_chart(
+        {"t": view["t"], "min": view["min"], "mean": view["mean"], "max": view["max"]},
+        x="t",
+        y=["min", "mean", "max"],
+    )
+    st.caption(f"{len(view['t'])} points shown for {max(t1 - t0, 0)} ticks (min/max envelope per bucket)")
+elif samples:
     cpu_temp = extract_signal_series(samples, ["cpu_temp_c", "cpu_temp", "cpu_temperature_c"])
     psu_v = extract_signal_series(samples, ["psu_voltage_v", "psu_voltage", "v_psu"])
     fan_rpm = extract_signal_series(samples, ["fan_rpm", "rpm_fan", "fan0_rpm"])
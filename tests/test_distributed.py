@@ -0,0 +1,74 @@
+import socket
+import threading
+import time
+
+from app.distributed import Coordinator, Worker, read_messages, send_message
+
+PLAN = {
+    "name": "Localhost smoke",
+    "steps": [{"name": "Load", "action": "stress", "duration": 6, "params": {"load": 50}}],
+}
+
+
+def make_jobs(count):
+    return [{"job_id": f"{idx:05d}_smoke_s{idx}", "plan_path": "smoke.yaml", "plan": PLAN, "seed": idx}
+            for idx in range(count)]
+
+
+def start_coordinator(jobs, **kwargs):
+    coordinator = Coordinator(jobs, host="127.0.0.1", port=0, **kwargs)
+    thread = threading.Thread(target=coordinator.run, daemon=True)
+    thread.start()
+    wait_for(lambda: coordinator.port != 0)
+    return coordinator, thread
+
+
+def start_worker(coordinator, name, tmp_path, realtime=False):
+    worker = Worker("127.0.0.1", coordinator.port, name=name, output_dir=str(tmp_path / name), realtime=realtime)
+    thread = threading.Thread(target=worker.run, daemon=True)
+    thread.start()
+    return worker, thread
+
+
+def wait_for(predicate, timeout=20.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_idle_worker_steals_backlog(tmp_path):
+    coordinator, thread = start_coordinator(make_jobs(4), prefetch=4)
+
+    # The first (slow) worker is handed the whole matrix before the second joins
+    start_worker(coordinator, "slow", tmp_path, realtime=True)
+    wait_for(lambda: "slow" in coordinator.workers and len(coordinator.workers["slow"].assigned) == 4)
+    start_worker(coordinator, "fast", tmp_path)
+
+    thread.join(timeout=30)
+    assert not thread.is_alive()
+    assert len(coordinator.results) == 4 and not coordinator.failed
+    assert any(summary['worker'] == "fast" for summary in coordinator.results.values())
+
+
+def test_killed_worker_jobs_are_requeued(tmp_path):
+    jobs = make_jobs(3)
+    coordinator, thread = start_coordinator(jobs, prefetch=2)
+
+    # A worker that takes jobs and dies without reporting back
+    doomed = socket.create_connection(("127.0.0.1", coordinator.port))
+    send_message(doomed, threading.Lock(), {"type": "hello", "worker": "doomed"})
+    batch = next(read_messages(doomed))
+    assert batch['type'] == "jobs" and len(batch['jobs']) == 2
+    doomed.close()
+
+    wait_for(lambda: "doomed" not in coordinator.workers)
+    start_worker(coordinator, "a", tmp_path)
+    start_worker(coordinator, "b", tmp_path)
+
+    thread.join(timeout=30)
+    assert not thread.is_alive()
+    assert sorted(coordinator.results) == [job['job_id'] for job in jobs]
+    assert not coordinator.failed
+    assert all(summary['worker'] != "doomed" for summary in coordinator.results.values())
+    assert sum(coordinator.attempts.values()) == 2